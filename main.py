@@ -1,18 +1,47 @@
 # main.py
-# Conversational ticket assistant using OpenAI (Python SDK) + Odoo JSON-RPC
+# Conversational ticket assistant using OpenAI (Chat Completions over aiohttp) + Odoo JSON-RPC
 
 import os
-import json
-import requests
+import re
+import orjson
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from types import MappingProxyType
+import aiohttp
+import httpx
 from dotenv import load_dotenv
-from openai import OpenAI
+from prompt_toolkit import PromptSession
+from prompt_toolkit.patch_stdout import patch_stdout
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+from reply_stream import ReplyScanner
 
 # ---------------------------------------------------------------------
 # Load environment variables
 # ---------------------------------------------------------------------
 load_dotenv()
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+
+# One shared aiohttp session for OpenAI calls, created on first use because it
+# must be bound to the running event loop
+_openai_session = None
+
+
+def _get_openai_session() -> aiohttp.ClientSession:
+    global _openai_session
+    if _openai_session is None:
+        _openai_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=64, ttl_dns_cache=300),
+            headers={
+                "Authorization": f"Bearer {OPENAI_API_KEY}",
+                "Content-Type": "application/json",
+            },
+        )
+    return _openai_session
 
 # ---------------------------------------------------------------------
 # Ticket state kept on our side (Python)
@@ -33,76 +62,140 @@ ticket_state = {
 # ---------------------------------------------------------------------
 # Odoo integration – JSON-RPC using only standard fields
 # ---------------------------------------------------------------------
-def create_ticket_in_odoo(ticket: dict) -> None:
+@dataclass(frozen=True)
+class _OdooCfg:
+    url: str | None
+    db: str | None
+    user: str | None
+    pw: str | None
+
+
+# Read once at import; the per-ticket path never touches the environment
+_ODOO = _OdooCfg(
+    os.getenv("ODOO_URL"),
+    os.getenv("ODOO_DB"),
+    os.getenv("ODOO_USERNAME"),
+    os.getenv("ODOO_PASSWORD"),
+)
+_ODOO_READY = all((_ODOO.url, _ODOO.db, _ODOO.user, _ODOO.pw))
+
+# One shared async HTTP/2 client for all Odoo calls: the TLS handshake is paid
+# once, and login + create (and concurrent batches) multiplex over a single
+# connection while submissions run in the background of the chat loop
+# (with an explicit transport, httpx takes http2/limits from the transport only)
+_odoo_client = httpx.AsyncClient(
+    base_url=_ODOO.url or "",
+    timeout=10.0,
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_connections=8, max_keepalive_connections=8),
+    ),
+    headers={"Content-Type": "application/json"},
+)
+
+# Cached uid; the login RPC runs once per process
+_odoo_uid = None
+
+# Each ready ticket is sent in the background right away; tickets that become
+# ready while a send is still in flight are queued and go out together in one
+# "create" call with the next send, or once this many pile up
+ODOO_BATCH_SIZE = 5
+
+
+async def _odoo_login() -> int:
     """
-    Send the ticket to Odoo via JSON-RPC (minimal version using only standard fields).
-    This assumes:
-      - ODOO_URL points to the Odoo base URL (e.g., https://my-odoo.example.com)
-      - ODOO_DB, ODOO_USERNAME, ODOO_PASSWORD are correct
-      - The model 'helpdesk.ticket' exists and has at least: name, description, priority
+    Authenticate to Odoo and return the uid. Cached, so the login RPC runs once per process.
+    Raises if authentication fails (failures are not cached).
     """
+    global _odoo_uid
+    if _odoo_uid:
+        return _odoo_uid
 
-    odoo_url = os.getenv("ODOO_URL")
-    odoo_db = os.getenv("ODOO_DB")
-    odoo_username = os.getenv("ODOO_USERNAME")
-    odoo_password = os.getenv("ODOO_PASSWORD")
-
-    if not all([odoo_url, odoo_db, odoo_username, odoo_password]):
-        print("\n[ODOO] Missing Odoo env variables. Please set ODOO_URL, ODOO_DB, ODOO_USERNAME, ODOO_PASSWORD in .env.")
-        print("[ODOO] Ticket was NOT sent to Odoo, but payload is shown below:\n")
-        print(json.dumps(ticket, indent=2))
-        return
-
-    # 1) Authenticate to Odoo to get uid
     auth_payload = {
         "jsonrpc": "2.0",
         "method": "call",
         "params": {
             "service": "common",
             "method": "login",
-            "args": [odoo_db, odoo_username, odoo_password],
+            "args": [_ODOO.db, _ODOO.user, _ODOO.pw],
         },
         "id": 1,
     }
 
-    try:
-        auth_res = requests.post(odoo_url + "/jsonrpc", json=auth_payload)
-        auth_res.raise_for_status()
-        auth_data = auth_res.json()
-        uid = auth_data.get("result")
-    except Exception as e:
-        print(f"\n[ODOO] Error during authentication: {e}")
-        print("[ODOO] Ticket was NOT sent to Odoo, but payload is shown below:\n")
-        print(json.dumps(ticket, indent=2))
+    auth_res = await _odoo_client.post("/jsonrpc", content=orjson.dumps(auth_payload))
+    auth_res.raise_for_status()
+    uid = orjson.loads(auth_res.content).get("result")
+    if not uid:
+        raise ValueError("Authentication failed, uid is empty.")
+
+    _odoo_uid = uid
+    return uid
+
+
+# Map human priority -> Odoo priority (adjust for your instance if needed)
+_PRIORITY_MAP = MappingProxyType({
+    "low": "0",
+    "medium": "1",
+    "high": "2",
+})
+
+# Rich description using all the ticket details (filled with str.format_map)
+_DESC_TEMPLATE = (
+    "Type: {type}\n"
+    "Problem/Context:\n{problem_context}\n\n"
+    "Expected Outcome:\n{expected_outcome}\n\n"
+    "Proposed Solution:\n{proposed_solution}\n\n"
+    "Affected Users:\n{affected_users}\n\n"
+    "Urgency Stars: {urgency_stars}\n"
+    "Requested By: {requested_by}\n"
+    "Source: {source}\n"
+)
+
+
+def _build_odoo_record(ticket: dict) -> dict:
+    """
+    Map one ticket to a 'helpdesk.ticket' record using only standard fields.
+    """
+    odoo_priority = _PRIORITY_MAP.get(ticket.get("priority") or "medium", "1")
+    description = _DESC_TEMPLATE.format_map(
+        {**ticket, "proposed_solution": ticket.get("proposed_solution") or ""}
+    )
+
+    return {
+        "name": ticket.get("title"),       # ticket title
+        "description": description,        # full context
+        "priority": odoo_priority,         # mapped priority
+    }
+
+
+async def create_tickets_in_odoo(tickets: list[dict]) -> None:
+    """
+    Send the tickets to Odoo via JSON-RPC (minimal version using only standard fields).
+    All tickets go in a single "create" call, which returns one id per record.
+    This assumes:
+      - ODOO_URL points to the Odoo base URL (e.g., https://my-odoo.example.com)
+      - ODOO_DB, ODOO_USERNAME, ODOO_PASSWORD are correct
+      - The model 'helpdesk.ticket' exists and has at least: name, description, priority
+    """
+    if not tickets:
         return
 
-    if not uid:
-        print("\n[ODOO] Authentication failed, uid is empty.")
-        print("[ODOO] Ticket was NOT sent to Odoo, but payload is shown below:\n")
-        print(json.dumps(ticket, indent=2))
+    if not _ODOO_READY:
+        # The missing-settings warning is printed once at startup
+        print(f"\n[ODOO] Odoo is not configured. {len(tickets)} ticket(s) were NOT sent to Odoo.")
         return
 
-    # Map human priority -> Odoo priority (adjust for your instance if needed)
-    priority_map = {
-        "low": "0",
-        "medium": "1",
-        "high": "2",
-    }
-    odoo_priority = priority_map.get(ticket.get("priority", "medium"), "1")
-
-    # Build a rich description using all the ticket details
-    description = (
-        f"Type: {ticket.get('type')}\n"
-        f"Problem/Context:\n{ticket.get('problem_context')}\n\n"
-        f"Expected Outcome:\n{ticket.get('expected_outcome')}\n\n"
-        f"Proposed Solution:\n{ticket.get('proposed_solution') or ''}\n\n"
-        f"Affected Users:\n{ticket.get('affected_users')}\n\n"
-        f"Urgency Stars: {ticket.get('urgency_stars')}\n"
-        f"Requested By: {ticket.get('requested_by')}\n"
-        f"Source: {ticket.get('source')}\n"
-    )
+    # 1) Authenticate to Odoo to get uid (cached for the whole process)
+    try:
+        uid = await _odoo_login()
+    except Exception as e:
+        print(f"\n[ODOO] Error during authentication: {e}")
+        print("[ODOO] Tickets were NOT sent to Odoo, but payload is shown below:\n")
+        print(orjson.dumps(tickets, option=orjson.OPT_INDENT_2).decode())
+        return
 
-    # 2) Create ticket record in Odoo using only standard fields
+    # 2) Create all ticket records in Odoo with one call
     create_payload = {
         "jsonrpc": "2.0",
         "method": "call",
@@ -110,39 +203,33 @@ def create_ticket_in_odoo(ticket: dict) -> None:
             "service": "object",
             "method": "execute_kw",
             "args": [
-                odoo_db,
+                _ODOO.db,
                 uid,
-                odoo_password,
+                _ODOO.pw,
                 "helpdesk.ticket",  # model name
                 "create",
-                [
-                    {
-                        "name": ticket.get("title"),       # ticket title
-                        "description": description,        # full context
-                        "priority": odoo_priority,         # mapped priority
-                    }
-                ],
+                [[_build_odoo_record(ticket) for ticket in tickets]],
             ],
         },
         "id": 2,
     }
 
     try:
-        create_res = requests.post(odoo_url + "/jsonrpc", json=create_payload)
+        create_res = await _odoo_client.post("/jsonrpc", content=orjson.dumps(create_payload))
         create_res.raise_for_status()
-        create_data = create_res.json()
-        ticket_id = create_data.get("result")
+        create_data = orjson.loads(create_res.content)
+        ticket_ids = create_data.get("result")
     except Exception as e:
-        print(f"\n[ODOO] Error creating ticket: {e}")
+        print(f"\n[ODOO] Error creating tickets: {e}")
         print("[ODOO] Ticket payload that failed:\n")
-        print(json.dumps(ticket, indent=2))
+        print(orjson.dumps(tickets, option=orjson.OPT_INDENT_2).decode())
         return
 
-    if ticket_id:
-        print("\n[ODOO] Ticket successfully created in Odoo.")
-        print(f"[ODOO] New ticket ID: {ticket_id}\n")
+    if ticket_ids:
+        print(f"\n[ODOO] {len(ticket_ids)} ticket(s) successfully created in Odoo.")
+        print(f"[ODOO] New ticket IDs: {ticket_ids}\n")
     else:
-        print("\n[ODOO] Unknown error: no ticket_id returned.")
+        print("\n[ODOO] Unknown error: no ticket ids returned.")
         print("[ODOO] Raw response:\n", create_data)
 
 
@@ -180,6 +267,8 @@ You must:
 Important:
 - Be proactive with clarifying questions.
 - Keep improving the ticket fields each time (never discard helpful information).
+- The last message, "CURRENT_TICKET_STATE: {...}", is the ticket so far as JSON;
+  start from it and do not throw away useful information.
 - When the ticket is detailed enough for a developer to implement without more
   clarification, mark it as ready.
 
@@ -212,39 +301,201 @@ Rules:
 - "is_ticket_ready" = true ONLY when all fields are reasonably complete and clear.
 """
 
+# Built once: the leading system message is identical on every turn
+_SYSTEM_MSG = {"role": "system", "content": SYSTEM_PROMPT}
+
+# The ticket state goes *after* the conversation, so the system prompt plus the
+# earlier turns form a stable prefix that OpenAI's prompt cache can reuse
+_STATE_PREFIX = "CURRENT_TICKET_STATE: "
+
+# History is capped: once it reaches MAX_HISTORY_MESSAGES it is cut back to the
+# last HISTORY_TRIM_TO messages in one step. Trimming in steps (instead of
+# dropping one message per turn) keeps the prefix stable between trims, so the
+# prompt cache keeps hitting. Older context survives in the ticket state,
+# which is always sent in full.
+MAX_HISTORY_MESSAGES = 40
+HISTORY_TRIM_TO = 20
+
+# Serialized ticket_state, only rebuilt after ticket_state actually changes
+_ticket_state_json = ""
+_ticket_state_dirty = True
+
+
+def trim_history(conversation_messages: list) -> None:
+    """
+    Cut the history back to the last HISTORY_TRIM_TO messages once it is full,
+    starting on a user message.
+    """
+    if len(conversation_messages) < MAX_HISTORY_MESSAGES:
+        return
+    del conversation_messages[:-HISTORY_TRIM_TO]
+    while conversation_messages and conversation_messages[0]["role"] != "user":
+        del conversation_messages[0]
+
+
+# ---------------------------------------------------------------------
+# OpenAI retries and rate limiting
+# ---------------------------------------------------------------------
+# Pause proactively once the remaining request/token budget drops this low
+RATE_LIMIT_LOW_REQUESTS = 1
+RATE_LIMIT_LOW_TOKENS = 2000
+
+_DURATION_PART_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+# Loop time before which the next OpenAI request should not be sent
+_openai_not_before = 0.0
+
+_backoff = wait_exponential_jitter(initial=0.5, max=8)
+
+
+def _parse_reset(value) -> float:
+    """
+    Parse an x-ratelimit-reset-* header (e.g. "1s", "6m0s", "20ms") into seconds.
+    """
+    if not value:
+        return 0.0
+    return sum(float(n) * _DURATION_UNITS[unit] for n, unit in _DURATION_PART_RE.findall(value))
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status == 429 or exc.status >= 500
+    return isinstance(exc, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+
+def _parse_retry_after(value):
+    """
+    Parse a Retry-After header (seconds or an HTTP-date) into seconds, or None.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def _wait_for_retry(retry_state) -> float:
+    """
+    Honor the server's Retry-After header when present, otherwise back off exponentially.
+    """
+    exc = retry_state.outcome.exception()
+    headers = getattr(exc, "headers", None) or {}
+    retry_after = _parse_retry_after(headers.get("Retry-After"))
+    if retry_after is None:
+        return _backoff(retry_state)
+    return min(retry_after, 30.0)
+
+
+def _note_rate_limits(headers) -> None:
+    """
+    Remember when to resume if this response says the rate-limit budget is nearly spent.
+    """
+    global _openai_not_before
+    pause = 0.0
+    for kind, low in (("requests", RATE_LIMIT_LOW_REQUESTS), ("tokens", RATE_LIMIT_LOW_TOKENS)):
+        remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+        if remaining is not None and remaining.isdigit() and int(remaining) <= low:
+            pause = max(pause, _parse_reset(headers.get(f"x-ratelimit-reset-{kind}")))
+    if pause:
+        _openai_not_before = asyncio.get_running_loop().time() + pause
+
+
+@retry(
+    retry=retry_if_exception(_is_retryable),
+    wait=_wait_for_retry,
+    stop=stop_after_attempt(5),
+    reraise=True,
+)
+async def _open_chat_stream(body: bytes) -> aiohttp.ClientResponse:
+    """
+    POST to Chat Completions and return the streaming response once it is accepted.
+    429/5xx and connection errors are retried; only opening the stream is retried.
+    """
+    delay = _openai_not_before - asyncio.get_running_loop().time()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+    response = await _get_openai_session().post(OPENAI_CHAT_URL, data=body)
+    _note_rate_limits(response.headers)
+    response.raise_for_status()
+    return response
+
 
 # ---------------------------------------------------------------------
 # OpenAI call per turn – with JSON mode to avoid parse errors
 # ---------------------------------------------------------------------
-def call_openai(conversation_messages):
+async def call_openai(conversation_messages):
     """
     Call OpenAI Chat Completions API, enforcing JSON output with response_format.
     This eliminates most "invalid JSON" issues even if you type quickly.
+
+    The response is streamed: the "assistant_reply" field is printed as soon
+    as it arrives. Returns (raw_json, printed_reply).
     """
-    ticket_json = json.dumps(ticket_state)
+    global _ticket_state_json, _ticket_state_dirty
+    if _ticket_state_dirty:
+        _ticket_state_json = orjson.dumps(ticket_state).decode()
+        _ticket_state_dirty = False
 
     messages = [
-        {"role": "system", "content": SYSTEM_PROMPT},
-        {
-            "role": "assistant",
-            "content": (
-                "Here is the current ticket state in JSON. "
-                "Improve it; do not throw away useful information:\n"
-                f"{ticket_json}"
-            ),
-        },
+        _SYSTEM_MSG,
+        *conversation_messages,
+        {"role": "system", "content": _STATE_PREFIX + _ticket_state_json},
     ]
-    messages.extend(conversation_messages)
 
-    response = client.chat.completions.create(
-        model="gpt-4.1-mini",  # or another model you prefer
-        messages=messages,
-        temperature=0.2,
-        response_format={"type": "json_object"},  # JSON mode
-    )
+    payload = {
+        "model": "gpt-4.1-mini",  # or another model you prefer
+        "messages": messages,
+        "temperature": 0.2,
+        "response_format": {"type": "json_object"},  # JSON mode
+        "stream": True,
+    }
+
+    buf = ""
+    printed = ""
+    reply_done = False
+    scanner = ReplyScanner()
+    response = await _open_chat_stream(orjson.dumps(payload))
+    async with response:
+        # Server-sent events: one "data: {...}" line per chunk, then "data: [DONE]"
+        async for line in response.content:
+            line = line.strip()
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                break
 
-    content = response.choices[0].message.content
-    return content
+            try:
+                event = orjson.loads(data)
+            except orjson.JSONDecodeError as e:
+                raise aiohttp.ClientPayloadError(f"Malformed stream chunk: {e}") from e
+            choices = event.get("choices") if isinstance(event, dict) else None
+            if not choices:
+                continue
+            buf += choices[0].get("delta", {}).get("content") or ""
+            if reply_done:
+                continue
+
+            text, reply_done = scanner.feed(buf)
+            if len(text) > len(printed):
+                if not printed:
+                    print("Bot: ", end="", flush=True)
+                print(text[len(printed):], end="", flush=True)
+                printed = text
+
+    if printed:
+        print("\n")
+    return buf, printed
 
 
 def merge_ticket_state(new_ticket: dict):
@@ -252,92 +503,164 @@ def merge_ticket_state(new_ticket: dict):
     Update our ticket_state with the model's new_ticket.
     Do not overwrite with null/empty if we already have a better value.
     """
-    global ticket_state
-    for key, value in new_ticket.items():
-        if value is None:
-            continue
-        if isinstance(value, str) and value.strip() == "":
-            continue
-        ticket_state[key] = value
+    global ticket_state, _ticket_state_dirty
+    filtered = {
+        key: value
+        for key, value in new_ticket.items()
+        if value is not None and not (isinstance(value, str) and not value.strip())
+    }
+    if any(ticket_state.get(key) != value for key, value in filtered.items()):
+        ticket_state.update(filtered)
+        _ticket_state_dirty = True
+
+
+async def _wait_for_odoo_send(task) -> None:
+    """
+    Await a background Odoo send; report (rather than raise) anything it missed
+    so queued tickets behind it are still sent.
+    """
+    if task is None:
+        return
+    try:
+        await task
+    except Exception as e:
+        print(f"\n[ODOO] Background send failed: {e}")
+
+
+async def run_chat():
+    global ticket_state, _ticket_state_dirty
 
+    if not OPENAI_API_KEY:
+        raise SystemExit("Missing OPENAI_API_KEY. Please set it in .env (see README).")
 
-def run_chat():
-    global ticket_state
+    # Async terminal prompt: the event loop keeps running (background Odoo sends,
+    # etc.) while the user is typing. Created here so importing main needs no terminal.
+    prompt_session = PromptSession()
 
     print("Ticket Assistant (Python + OpenAI + Odoo)")
     print("Type 'exit' or 'quit' to stop.\n")
+    if not _ODOO_READY:
+        print("[ODOO] Missing Odoo env variables. Please set ODOO_URL, ODOO_DB, ODOO_USERNAME, ODOO_PASSWORD in .env.")
+        print("[ODOO] Tickets will be shown here but NOT sent to Odoo.\n")
 
-    # conversation_messages is a list of {role, content} for user+assistant
+    # conversation_messages holds the recent {role, content} for user+assistant
     conversation_messages = []
+    # ready tickets waiting for the in-flight Odoo send to finish
+    pending_tickets = []
+    # in-flight Odoo submission, awaited only before the next one or on exit
+    odoo_task = None
 
-    while True:
-        user_input = input("You: ").strip()
-        if user_input.lower() in {"exit", "quit"}:
-            print("Bot: Goodbye!")
-            break
-
-        # Add user message
-        conversation_messages.append({"role": "user", "content": user_input})
-
-        # Call OpenAI
-        raw = call_openai(conversation_messages)
+    try:
+        while True:
+            user_input = (await prompt_session.prompt_async("You: ")).strip()
+            if user_input.lower() in {"exit", "quit"}:
+                print("Bot: Goodbye!")
+                break
 
-        # Parse JSON (JSON mode should guarantee valid JSON)
-        try:
-            data = json.loads(raw)
-        except json.JSONDecodeError:
-            print("Bot: Sorry, I had trouble formatting my response. Let me try again.\n")
+            # Add user message
+            conversation_messages.append({"role": "user", "content": user_input})
+            trim_history(conversation_messages)
+
+            # Call OpenAI (transient errors were already retried)
+            try:
+                raw, streamed_reply = await call_openai(conversation_messages)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"\nBot: Sorry, I couldn't reach OpenAI ({e}). Please send that again.\n")
+                conversation_messages.pop()
+                continue
+
+            # Parse JSON (JSON mode should guarantee valid JSON)
+            try:
+                data = orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                print("Bot: Sorry, I had trouble formatting my response. Let me try again.\n")
+                conversation_messages.append({
+                    "role": "assistant",
+                    "content": "I produced invalid JSON. Please ask your question again."
+                })
+                continue
+
+            assistant_reply = data.get("assistant_reply", "").strip()
+            new_ticket = data.get("ticket", {}) or {}
+            is_ticket_ready = bool(data.get("is_ticket_ready", False))
+
+            # Merge ticket state
+            merge_ticket_state(new_ticket)
+
+            # Print the bot's human-facing reply (unless it was already streamed)
+            if assistant_reply and streamed_reply.strip() != assistant_reply:
+                print(f"Bot: {assistant_reply}\n")
+
+            # Add assistant reply to conversation history
             conversation_messages.append({
                 "role": "assistant",
-                "content": "I produced invalid JSON. Please ask your question again."
+                "content": assistant_reply
             })
-            continue
-
-        assistant_reply = data.get("assistant_reply", "").strip()
-        new_ticket = data.get("ticket", {}) or {}
-        is_ticket_ready = bool(data.get("is_ticket_ready", False))
-
-        # Merge ticket state
-        merge_ticket_state(new_ticket)
-
-        # Print the bot's human-facing reply
-        print(f"Bot: {assistant_reply}\n")
-
-        # Add assistant reply to conversation history
-        conversation_messages.append({
-            "role": "assistant",
-            "content": assistant_reply
-        })
-
-        # If the ticket is ready, show final payload and send to Odoo
-        if is_ticket_ready:
-            print("Bot: I believe the ticket is now ready. Here is a summary of what will be sent:\n")
-            print(json.dumps(ticket_state, indent=2))
-
-            # Real send to Odoo
-            create_ticket_in_odoo(ticket_state)
-
-            again = input("Create another ticket? (y/n): ").strip().lower()
-            if again == "y":
-                # reset state and conversation
-                ticket_state = {
-                    "type": None,
-                    "title": None,
-                    "problem_context": None,
-                    "expected_outcome": None,
-                    "proposed_solution": None,
-                    "affected_users": None,
-                    "priority": None,
-                    "urgency_stars": None,
-                    "source": "Chatbot",
-                    "requested_by": None,
-                }
-                conversation_messages = []
-                print("\nStarting a new ticket.\n")
-            else:
-                print("Bot: Okay, goodbye!")
-                break
+
+            # If the ticket is ready, show final payload and queue it for Odoo
+            if is_ticket_ready:
+                if _ODOO_READY:
+                    print("Bot: I believe the ticket is now ready. Here is a summary of what will be sent to Odoo:\n")
+                else:
+                    print("Bot: I believe the ticket is now ready. Here is a summary of the ticket:\n")
+                # Print the summary before any Odoo send starts, so their output
+                # never interleaves; the send still overlaps the next prompt
+                print(orjson.dumps(ticket_state, option=orjson.OPT_INDENT_2).decode())
+
+                # Send in the background so the Odoo round-trips overlap with the
+                # next prompt; if a send is still in flight, batch behind it
+                sending = False
+                if _ODOO_READY:
+                    pending_tickets.append(dict(ticket_state))
+                    sending = odoo_task is None or odoo_task.done() or len(pending_tickets) >= ODOO_BATCH_SIZE
+                    if sending:
+                        await _wait_for_odoo_send(odoo_task)
+                        odoo_task = asyncio.create_task(create_tickets_in_odoo(pending_tickets))
+                        pending_tickets = []
+
+                if not _ODOO_READY:
+                    print("\nBot: Odoo is not configured, so this ticket was NOT sent. The summary above has everything in it.\n")
+                elif sending:
+                    print("\nBot: Sending the ticket to Odoo in the background.\n")
+                else:
+                    print("\nBot: Ticket queued. It will be sent to Odoo with the next batch, or when you leave.\n")
+
+                again = (await prompt_session.prompt_async("Create another ticket? (y/n): ")).strip().lower()
+                if again == "y":
+                    # reset state and conversation
+                    ticket_state = {
+                        "type": None,
+                        "title": None,
+                        "problem_context": None,
+                        "expected_outcome": None,
+                        "proposed_solution": None,
+                        "affected_users": None,
+                        "priority": None,
+                        "urgency_stars": None,
+                        "source": "Chatbot",
+                        "requested_by": None,
+                    }
+                    _ticket_state_dirty = True
+                    conversation_messages = []
+                    print("\nStarting a new ticket.\n")
+                else:
+                    print("Bot: Okay, goodbye!")
+                    break
+    except (EOFError, KeyboardInterrupt):
+        # Ctrl-D / Ctrl-C at the prompt: leave like "exit"
+        print("Bot: Goodbye!")
+    finally:
+        # Whatever the exit path, never drop queued tickets or leak connections
+        try:
+            await _wait_for_odoo_send(odoo_task)
+            await create_tickets_in_odoo(pending_tickets)
+        finally:
+            await _odoo_client.aclose()
+            if _openai_session is not None:
+                await _openai_session.close()
 
 
 if __name__ == "__main__":
-    run_chat()
+    # Keep background output (e.g. Odoo results) from garbling the prompt line
+    with patch_stdout():
+        asyncio.run(run_chat())
@@ -0,0 +1,100 @@
+# reply_stream.py
+# Incremental extraction of "assistant_reply" from a streamed JSON response
+
+import orjson
+
+_REPLY_KEY = '"assistant_reply"'
+
+
+class ReplyScanner:
+    """
+    Pull the "assistant_reply" string out of a JSON document while it is still
+    arriving. Call feed() with the whole buffer after every chunk; it resumes
+    where the previous call stopped, so total work stays linear in the reply.
+
+    Only fully received escape sequences (including \\uXXXX surrogate pairs)
+    are decoded, so the returned text only ever grows.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.done = False
+        self._key_from = 0     # where to resume looking for the key
+        self._key_end = None   # index just after the key, once found
+        self._pos = None       # start of the not-yet-decoded part of the value
+
+    def feed(self, buf: str):
+        """
+        Return (text, done) for the reply seen so far in buf.
+        """
+        if self.done:
+            return self.text, True
+        if self._pos is None and not self._find_value(buf):
+            return self.text, False
+
+        i = safe_end = self._pos
+        while i < len(buf):
+            ch = buf[i]
+            if ch == '"':
+                self.done = True
+                break
+            if ch == "\\":
+                if i + 1 >= len(buf):
+                    break
+                if buf[i + 1] == "u":
+                    step = 6
+                    # A high surrogate is only decodable together with its pair
+                    if "d800" <= buf[i + 2:i + 6].lower() <= "dbff":
+                        step = 12
+                    if i + step > len(buf):
+                        break
+                    i += step
+                else:
+                    i += 2
+            else:
+                i += 1
+            safe_end = i
+
+        if safe_end > self._pos:
+            try:
+                self.text += orjson.loads('"' + buf[self._pos:safe_end] + '"')
+            except orjson.JSONDecodeError:
+                # Malformed escape: stop streaming, the final parse reports it
+                self.done = True
+                return self.text, True
+            self._pos = safe_end
+        return self.text, self.done
+
+    def _find_value(self, buf: str) -> bool:
+        """
+        Locate the opening quote of the reply value; False if not received yet.
+        """
+        while True:
+            if self._key_end is None:
+                idx = buf.find(_REPLY_KEY, self._key_from)
+                if idx < 0:
+                    self._key_from = max(0, len(buf) - len(_REPLY_KEY) + 1)
+                    return False
+                self._key_end = idx + len(_REPLY_KEY)
+
+            # Expect: whitespace, ":", whitespace, '"'
+            i = self._key_end
+            seen_colon = False
+            while i < len(buf):
+                ch = buf[i]
+                if ch.isspace():
+                    i += 1
+                elif ch == ":" and not seen_colon:
+                    seen_colon = True
+                    i += 1
+                elif ch == '"' and seen_colon:
+                    self._pos = i + 1
+                    return True
+                else:
+                    break
+            else:
+                return False
+
+            # Not a "key": "value" pair (e.g. the text appeared inside a value)
+            self._key_from = self._key_end
+            self._key_end = None
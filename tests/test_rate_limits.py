@@ -0,0 +1,150 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import aiohttp
+from multidict import CIMultiDict
+from tenacity import RetryCallState
+
+import main
+
+
+def response_error(status: int, headers=None) -> aiohttp.ClientResponseError:
+    return aiohttp.ClientResponseError(
+        request_info=None, history=(), status=status, headers=CIMultiDict(headers or {})
+    )
+
+
+def retry_state_for(exc: BaseException, attempt: int = 1) -> RetryCallState:
+    state = RetryCallState(retry_object=None, fn=None, args=(), kwargs={})
+    state.attempt_number = attempt
+    state.set_exception((type(exc), exc, None))
+    return state
+
+
+class ParseResetTest(unittest.TestCase):
+    def test_durations(self):
+        cases = {
+            "1s": 1.0,
+            "1.5s": 1.5,
+            "20ms": 0.02,
+            "6m0s": 360.0,
+            "1h2m3s": 3723.0,
+            "2m30.5s": 150.5,
+        }
+        for value, seconds in cases.items():
+            with self.subTest(value=value):
+                self.assertAlmostEqual(main._parse_reset(value), seconds)
+
+    def test_missing_or_unparseable(self):
+        for value in (None, "", "soon"):
+            with self.subTest(value=value):
+                self.assertEqual(main._parse_reset(value), 0.0)
+
+
+class IsRetryableTest(unittest.TestCase):
+    def test_rate_limit_and_server_errors_are_retried(self):
+        for status in (429, 500, 502, 503):
+            with self.subTest(status=status):
+                self.assertTrue(main._is_retryable(response_error(status)))
+
+    def test_other_client_errors_are_not_retried(self):
+        for status in (400, 401, 403, 404, 422):
+            with self.subTest(status=status):
+                self.assertFalse(main._is_retryable(response_error(status)))
+
+    def test_connection_errors_and_timeouts_are_retried(self):
+        self.assertTrue(main._is_retryable(aiohttp.ClientConnectionError()))
+        self.assertTrue(main._is_retryable(asyncio.TimeoutError()))
+
+    def test_other_exceptions_are_not_retried(self):
+        self.assertFalse(main._is_retryable(ValueError("boom")))
+
+
+class WaitForRetryTest(unittest.TestCase):
+    def test_retry_after_seconds(self):
+        state = retry_state_for(response_error(429, {"Retry-After": "3"}))
+        self.assertEqual(main._wait_for_retry(state), 3.0)
+
+    def test_retry_after_is_capped(self):
+        state = retry_state_for(response_error(429, {"Retry-After": "120"}))
+        self.assertEqual(main._wait_for_retry(state), 30.0)
+
+    def test_retry_after_http_date(self):
+        when = datetime.now(timezone.utc) + timedelta(seconds=10)
+        state = retry_state_for(response_error(503, {"Retry-After": format_datetime(when, usegmt=True)}))
+        self.assertTrue(8.0 <= main._wait_for_retry(state) <= 10.0)
+
+    def test_retry_after_date_in_the_past(self):
+        when = datetime.now(timezone.utc) - timedelta(minutes=5)
+        state = retry_state_for(response_error(503, {"Retry-After": format_datetime(when, usegmt=True)}))
+        self.assertEqual(main._wait_for_retry(state), 0.0)
+
+    def test_missing_or_invalid_retry_after_backs_off(self):
+        for exc in (response_error(500), response_error(429, {"Retry-After": "later"}),
+                    aiohttp.ClientConnectionError()):
+            with self.subTest(exc=exc):
+                # wait_exponential_jitter: 0.5 * 2**(attempt - 1) plus up to 1s of jitter
+                self.assertTrue(0.5 <= main._wait_for_retry(retry_state_for(exc, 1)) <= 1.5)
+                self.assertTrue(2.0 <= main._wait_for_retry(retry_state_for(exc, 3)) <= 3.0)
+                self.assertTrue(main._wait_for_retry(retry_state_for(exc, 10)) <= 8.0)
+
+
+class NoteRateLimitsTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        main._openai_not_before = 0.0
+
+    def tearDown(self):
+        main._openai_not_before = 0.0
+
+    async def pause_after(self, headers) -> float:
+        now = asyncio.get_running_loop().time()
+        main._note_rate_limits(CIMultiDict(headers))
+        return main._openai_not_before - now if main._openai_not_before else 0.0
+
+    async def test_plenty_of_budget_does_not_pause(self):
+        pause = await self.pause_after({
+            "x-ratelimit-remaining-requests": "499",
+            "x-ratelimit-reset-requests": "120ms",
+            "x-ratelimit-remaining-tokens": "150000",
+            "x-ratelimit-reset-tokens": "6m0s",
+        })
+        self.assertEqual(pause, 0.0)
+
+    async def test_low_request_budget_pauses_until_reset(self):
+        pause = await self.pause_after({
+            "x-ratelimit-remaining-requests": str(main.RATE_LIMIT_LOW_REQUESTS),
+            "x-ratelimit-reset-requests": "2s",
+            "x-ratelimit-remaining-tokens": "150000",
+        })
+        self.assertAlmostEqual(pause, 2.0, places=1)
+
+    async def test_low_token_budget_pauses_until_reset(self):
+        pause = await self.pause_after({
+            "x-ratelimit-remaining-requests": "499",
+            "x-ratelimit-remaining-tokens": str(main.RATE_LIMIT_LOW_TOKENS - 1),
+            "x-ratelimit-reset-tokens": "1.5s",
+        })
+        self.assertAlmostEqual(pause, 1.5, places=1)
+
+    async def test_longest_reset_wins_when_both_are_low(self):
+        pause = await self.pause_after({
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "500ms",
+            "x-ratelimit-remaining-tokens": "0",
+            "x-ratelimit-reset-tokens": "1m",
+        })
+        self.assertAlmostEqual(pause, 60.0, places=1)
+
+    async def test_missing_or_non_numeric_headers_are_ignored(self):
+        self.assertEqual(await self.pause_after({}), 0.0)
+        pause = await self.pause_after({
+            "x-ratelimit-remaining-requests": "unknown",
+            "x-ratelimit-reset-requests": "5s",
+        })
+        self.assertEqual(pause, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
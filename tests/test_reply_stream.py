@@ -0,0 +1,61 @@
+import json
+import unittest
+
+from reply_stream import ReplyScanner
+
+
+def feed_every_prefix(doc: str):
+    """
+    Feed doc to a fresh scanner one character at a time, checking the text only grows.
+    Returns the final (text, done).
+    """
+    scanner = ReplyScanner()
+    previous = ""
+    text, done = "", False
+    for end in range(len(doc) + 1):
+        text, done = scanner.feed(doc[:end])
+        assert text.startswith(previous), (previous, text)
+        previous = text
+    return text, done
+
+
+class ReplyScannerTest(unittest.TestCase):
+    def assert_streams(self, reply: str, **dumps_kwargs):
+        doc = json.dumps({"assistant_reply": reply, "ticket": {}}, **dumps_kwargs)
+        self.assertEqual(feed_every_prefix(doc), (reply, True))
+
+    def test_plain_text(self):
+        self.assert_streams("Hello, what is the bug about?")
+
+    def test_quotes_and_backslashes(self):
+        self.assert_streams('Say "hi" to C:\\temp\\ and \\"escaped\\"')
+
+    def test_newlines_and_tabs(self):
+        self.assert_streams("line one\nline two\n\ttabbed\r\n")
+
+    def test_unicode_escapes_and_surrogate_pairs(self):
+        # ensure_ascii forces \uXXXX escapes, emoji become surrogate pairs
+        self.assert_streams("caf\u00e9 \U0001F600 done \U0001F41B", ensure_ascii=True)
+
+    def test_raw_unicode(self):
+        self.assert_streams("caf\u00e9 \U0001F600", ensure_ascii=False)
+
+    def test_reply_after_other_fields_and_whitespace(self):
+        doc = '{"ticket": {"title": "x"},\n  "assistant_reply" \n:\t "ok \\"there\\""}'
+        self.assertEqual(feed_every_prefix(doc), ('ok "there"', True))
+
+    def test_key_text_inside_another_value_is_ignored(self):
+        doc = json.dumps({"problem": 'see "assistant_reply" field', "assistant_reply": "real"})
+        self.assertEqual(feed_every_prefix(doc), ("real", True))
+
+    def test_missing_reply(self):
+        self.assertEqual(feed_every_prefix('{"ticket": {}}'), ("", False))
+
+    def test_feed_after_done_is_stable(self):
+        scanner = ReplyScanner()
+        scanner.feed('{"assistant_reply": "a"')
+        self.assertEqual(scanner.feed('{"assistant_reply": "a", "x": "b"}'), ("a", True))
+
+
+if __name__ == "__main__":
+    unittest.main()